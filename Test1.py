@@ -2,110 +2,230 @@ import discord
 import os
 import asyncio
 import logging
+import logging.handlers
+import queue
 import aiosqlite
 from discord.ui import Select, View
 from discord import app_commands
-from discord.ext import commands
+from discord.ext import commands, tasks
 from discord.ui import Button, View
 from datetime import datetime, timedelta, timezone
 from dotenv import load_dotenv
-import random
+import itertools
+import re
+import time
 
 # ------------------- Setup ------------------- #
 
 # Load environment variables from .env file
 load_dotenv()
 
-# Setup logging
-logging.basicConfig(level=logging.INFO)
+# Setup logging; records are only queued on the event loop and written out by a background listener thread
+log_queue = queue.SimpleQueue()
+log_listener = logging.handlers.QueueListener(log_queue, logging.StreamHandler())
+logging.basicConfig(level=logging.INFO, handlers=[logging.handlers.QueueHandler(log_queue)])
+logger = logging.getLogger(__name__)
 
 # Define bot intents
 intents = discord.Intents.default()
-intents.message_content = True  # Enable reading message content
+intents.message_content = True  # Needed by SplitTracker.on_message to see loot screenshots and links
 intents.reactions = True        # Enable reaction tracking
-intents.members = True          # Enable member intents
 
-# Initialize the bot
-bot = commands.Bot(command_prefix="!", intents=intents)
-
-# Lock for concurrent access
-data_lock = asyncio.Lock()
+# Initialize the bot; members are fetched on demand instead of chunked at startup
+bot = commands.Bot(command_prefix="!", intents=intents, chunk_guilds_at_startup=False)
+
+# Token bucket that paces outgoing Discord REST calls; discord.py still handles any 429 itself
+class RateLimiter:
+    def __init__(self, rate, per):
+        self.rate = rate
+        self.per = per
+        self._tokens = rate
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def __aenter__(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.rate, self._tokens + (now - self._updated) * self.rate / self.per)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return self
+                await asyncio.sleep((1 - self._tokens) * self.per / self.rate)
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return False
+
+# Shared pacing for REST calls made from event handlers (~45 requests/second)
+bot.rest_limiter = RateLimiter(45, 1)
+
+# Pattern for user mentions (<@id> or <@!id>)
+_MENTION_RE = re.compile(r'<@!?(\d+)>')
+
+# Pattern for event start times (HH:MM)
+_HHMM_RE = re.compile(r'(\d{1,2}):(\d{1,2})')
 
 # ---------------- Helper Functions ---------------- #
 
-# Function to get or create a database for each server
-async def get_database_for_guild(guild_id):
-    db_filename = f'player_values_{guild_id}.db'
-    conn = await aiosqlite.connect(db_filename)
-    async with conn.cursor() as cursor:
-        # Create player_values table if it doesn't exist
-        await cursor.execute('''CREATE TABLE IF NOT EXISTS player_values (
-                                player_id INTEGER PRIMARY KEY, 
-                                total_value REAL
-                              )''')
-        # Create settings table if it doesn't exist
-        await cursor.execute('''CREATE TABLE IF NOT EXISTS settings (
-                                setting_name TEXT PRIMARY KEY,
-                                role_id INTEGER
-                              )''')
-        await conn.commit()
+# Cached database connections, one per guild
+_DB_CACHE = {}
+_DB_LOCKS = {}
+
+# Write locks, one per guild connection; the connection is shared, so one coroutine's
+# commit or rollback must never land inside another coroutine's transaction
+_DB_WRITE_LOCKS = {}
+
+# Function to get the write lock of a guild's database connection
+def db_write_lock(conn):
+    return _DB_WRITE_LOCKS.setdefault(conn, asyncio.Lock())
+
+# Function to get (or lazily create) the database connection for each server
+async def get_db(guild_id):
+    conn = _DB_CACHE.get(guild_id)
+    if conn is not None:
+        return conn
+
+    lock = _DB_LOCKS.setdefault(guild_id, asyncio.Lock())
+    async with lock:
+        conn = _DB_CACHE.get(guild_id)
+        if conn is None:
+            db_filename = f'player_values_{guild_id}.db'
+            conn = await aiosqlite.connect(db_filename)
+            try:
+                # WAL + NORMAL sync for cheap small writes; no shared cache (causes SQLITE_BUSY)
+                await conn.executescript(
+                    "PRAGMA journal_mode=WAL; PRAGMA synchronous=NORMAL; PRAGMA temp_store=MEMORY; "
+                    "PRAGMA cache_size=-20000; PRAGMA busy_timeout=5000;")
+                async with conn.cursor() as cursor:
+                    # Create player_values table if it doesn't exist
+                    await cursor.execute('''CREATE TABLE IF NOT EXISTS player_values (
+                                            player_id INTEGER PRIMARY KEY, 
+                                            total_value REAL
+                                          )''')
+                    # Create settings table if it doesn't exist
+                    await cursor.execute('''CREATE TABLE IF NOT EXISTS settings (
+                                            setting_name TEXT PRIMARY KEY,
+                                            role_id INTEGER
+                                          )''')
+                    await conn.commit()
+            except Exception:
+                # Never leave a half-initialised connection (and its thread) behind
+                await conn.close()
+                raise
+            _DB_CACHE[guild_id] = conn
     return conn
 
-# Helper functions to interact with the database
-async def get_player_value(conn, player_id):
-    async with conn.cursor() as cursor:
-        await cursor.execute(
-            "SELECT total_value FROM player_values WHERE player_id = ?",
-            (player_id,))
-        result = await cursor.fetchone()
-    return result[0] if result else 0
-
-async def update_player_value(conn, player_id, new_value):
-    async with conn.cursor() as cursor:
-        await cursor.execute(
-            "INSERT OR REPLACE INTO player_values (player_id, total_value) "
-            "VALUES (?, ?)", (player_id, new_value))
-        await conn.commit()
+# Close every cached database connection on shutdown
+async def close_databases():
+    for conn in _DB_CACHE.values():
+        await conn.close()
+    _DB_CACHE.clear()
+    _DB_WRITE_LOCKS.clear()
 
+# Helper functions to interact with the database
 async def reset_player_value(conn, player_id):
-    async with conn.cursor() as cursor:
-        await cursor.execute(
-            "UPDATE player_values SET total_value = 0 WHERE player_id = ?",
-            (player_id,))
-        await conn.commit()
+    async with db_write_lock(conn):
+        async with conn.cursor() as cursor:
+            await cursor.execute(
+                "UPDATE player_values SET total_value = 0 WHERE player_id = ?",
+                (player_id,))
+            await conn.commit()
 
 async def add_to_player_value(conn, player_id, amount):
-    current_value = await get_player_value(conn, player_id)
-    await update_player_value(conn, player_id, current_value + amount)
+    async with db_write_lock(conn):
+        await conn.execute(
+            "INSERT INTO player_values (player_id, total_value) VALUES (?, ?) "
+            "ON CONFLICT(player_id) DO UPDATE SET "
+            "total_value = total_value + excluded.total_value",
+            (player_id, amount))
+        await conn.commit()
 
 async def remove_from_player_value(conn, player_id, amount):
-    current_value = await get_player_value(conn, player_id)
-    await update_player_value(conn, player_id,
-                              max(current_value - amount, 0))
+    # A player without a row starts at 0, so removal never goes negative
+    async with db_write_lock(conn):
+        await conn.execute(
+            "INSERT INTO player_values (player_id, total_value) VALUES (?, 0) "
+            "ON CONFLICT(player_id) DO UPDATE SET "
+            "total_value = MAX(total_value - ?, 0)",
+            (player_id, amount))
+        await conn.commit()
 
-# Helper functions to interact with settings
-async def set_role_setting(conn, setting_name, role_id):
+# Get the totals of several players in a single query
+async def get_player_values(conn, player_ids):
+    placeholders = ", ".join("?" * len(player_ids))
     async with conn.cursor() as cursor:
         await cursor.execute(
-            "INSERT OR REPLACE INTO settings (setting_name, role_id) VALUES (?, ?)",
-            (setting_name, role_id))
+            f"SELECT player_id, total_value FROM player_values WHERE player_id IN ({placeholders})",
+            player_ids)
+        found = dict(await cursor.fetchall())
+    return {player_id: found.get(player_id, 0) for player_id in player_ids}
+
+# Add amounts to several players in a single transaction
+async def add_to_player_values(conn, player_amounts):
+    async with db_write_lock(conn):
+        try:
+            await conn.execute("BEGIN IMMEDIATE")
+            await conn.executemany(
+                "INSERT INTO player_values (player_id, total_value) VALUES (?, ?) "
+                "ON CONFLICT(player_id) DO UPDATE SET "
+                "total_value = total_value + excluded.total_value",
+                player_amounts)
+        except Exception:
+            # The connection is shared, so an open write transaction would block every later write
+            await conn.rollback()
+            raise
         await conn.commit()
 
-async def get_role_setting(conn, setting_name):
-    async with conn.cursor() as cursor:
-        await cursor.execute(
-            "SELECT role_id FROM settings WHERE setting_name = ?",
-            (setting_name,))
-        result = await cursor.fetchone()
-    return result[0] if result else None
+# Cached role settings per guild: {guild_id: {setting_name: role_id}}
+_SETTING_CACHE = {}
+
+# Helper functions to interact with settings
+async def set_role_setting(conn, setting_name, role_id, guild_id):
+    async with db_write_lock(conn):
+        async with conn.cursor() as cursor:
+            await cursor.execute(
+                "INSERT OR REPLACE INTO settings (setting_name, role_id) VALUES (?, ?)",
+                (setting_name, role_id))
+            await conn.commit()
+        if guild_id in _SETTING_CACHE:
+            _SETTING_CACHE[guild_id][setting_name] = role_id
+
+async def get_guild_settings(conn, guild_id):
+    settings = _SETTING_CACHE.get(guild_id)
+    if settings is None:
+        # Fill under the write lock, so a setting committed during the SELECT can't be
+        # overwritten by this older snapshot
+        async with db_write_lock(conn):
+            settings = _SETTING_CACHE.get(guild_id)
+            if settings is None:
+                async with conn.cursor() as cursor:
+                    await cursor.execute("SELECT setting_name, role_id FROM settings")
+                    settings = dict(await cursor.fetchall())
+                _SETTING_CACHE[guild_id] = settings
+    return settings
+
+async def get_role_setting(conn, setting_name, guild_id):
+    settings = await get_guild_settings(conn, guild_id)
+    return settings.get(setting_name)
 
 # Function to format numbers
 def format_number(value):
-    if value >= 1_000_000:
-        return f"{value / 1_000_000:.1f}m"
-    elif value >= 1_000:
+    # Small values are the common case, so check them first
+    if value < 1_000:
+        return str(value) if isinstance(value, int) else str(int(value))
+    if value < 1_000_000:
         return f"{value / 1_000:.1f}k"
-    return str(int(value))
+    return f"{value / 1_000_000:.1f}m"
+
+# Function to render one line of the "Roles Needed" field
+def format_role_line(role_name, users):
+    return f"{role_name}: {', '.join(users)}" if users else role_name
+
+# Function to render one participant line of a loot split embed
+def format_split_line(info, formatted_share):
+    checkmark = "✅" if info['submitted'] else "❌"
+    return f"{info['display_name']} {checkmark} | Share: {formatted_share} | Total Loot: 💰 `{info['formatted_total']}`"
 
 # Function to parse value with suffixes (k, m)
 def parse_value(value_str):
@@ -119,34 +239,57 @@ def parse_value(value_str):
             return float(value_str)
     except ValueError:
         return None
-# Function to track event time
-async def track_event_time(interaction, event_start_time):
-    five_minute_reminder_sent = False
-
-    while True:
-        now = datetime.now(timezone.utc)
-        remaining_time = event_start_time - now
 
-        if remaining_time.total_seconds() <= 0:
-            await interaction.followup.send("🚨 Time's up! The event is starting now! 🚨")
-            break
-
-        if remaining_time.total_seconds() <= 300 and not five_minute_reminder_sent:
-            await interaction.followup.send("⚠️ Reminder: The event starts in 5 minutes! ⚠️")
-            five_minute_reminder_sent = True
-
-        await asyncio.sleep(60)
+# Function to turn an "HH:MM" UTC string into the next matching datetime
+def _parse_hhmm_utc(time_str):
+    match = _HHMM_RE.fullmatch(time_str)
+    if not match:
+        raise ValueError(f"Invalid time: {time_str}")
+    hours, minutes = int(match.group(1)), int(match.group(2))
+    if hours >= 24 or minutes >= 60:
+        raise ValueError(f"Invalid time: {time_str}")
+
+    now_utc = datetime.now(timezone.utc)
+    event_start_time = now_utc.replace(hour=hours, minute=minutes, second=0, microsecond=0)
+    if event_start_time < now_utc:
+        event_start_time += timedelta(days=1)
+    return event_start_time
+
+# Function to post a message to a channel after a delay
+async def send_after(channel, delay, content):
+    if delay > 0:
+        await asyncio.sleep(delay)
+    await channel.send(content)
+
+# Function to schedule the 5-minute reminder and the start announcement of an event
+def schedule_event_reminders(channel, event_start_time):
+    remaining_seconds = (event_start_time - datetime.now(timezone.utc)).total_seconds()
+    reminder_tasks = []
+    if remaining_seconds > 0:
+        reminder_tasks.append(asyncio.create_task(send_after(
+            channel, remaining_seconds - 300, "⚠️ Reminder: The event starts in 5 minutes! ⚠️")))
+    reminder_tasks.append(asyncio.create_task(send_after(
+        channel, remaining_seconds, "🚨 Time's up! The event is starting now! 🚨")))
+    return reminder_tasks
+
+# Function to drop events that started more than an hour ago
+def prune_expired_events(active_events, message_id_to_event_id):
+    cutoff = datetime.now(timezone.utc) - timedelta(hours=1)
+    for event_id, event_data in list(active_events.items()):
+        if event_data['start_time'] < cutoff:
+            del active_events[event_id]
+            message_id_to_event_id.pop(event_data['message_id'], None)
 
 # ---------------- Bot Events ---------------- #
 
 @bot.event
 async def on_ready():
-    print(f"Bot is online as {bot.user}")
+    logger.info("Bot is online as %s", bot.user)
     try:
         synced = await bot.tree.sync()
-        print(f"Slash commands synced: {len(synced)} commands")
-    except Exception as e:
-        print(f"Error syncing slash commands: {e}")
+        logger.info("Slash commands synced: %d commands", len(synced))
+    except Exception:
+        logger.exception("Error syncing slash commands")
 
 # ---------------- BotSettings Cog ---------------- #
 
@@ -155,7 +298,7 @@ class BotSettings(commands.Cog):
         self.bot = bot
 
     # Ensure only administrators can use the settings commands
-    async def cog_check(self, interaction: discord.Interaction):
+    async def interaction_check(self, interaction: discord.Interaction):
         if interaction.user.guild_permissions.administrator:
             return True
         else:
@@ -171,38 +314,63 @@ class BotSettings(commands.Cog):
         app_commands.Choice(name="Content Admin rights", value="Content Admin rights")
     ])
     async def set_role(self, interaction: discord.Interaction, permission_name: app_commands.Choice[str], role: discord.Role):
+        await interaction.response.defer(ephemeral=True, thinking=False)
         guild_id = interaction.guild_id
-        conn = await get_database_for_guild(guild_id)
+        conn = await get_db(guild_id)
 
-        await set_role_setting(conn, permission_name.value, role.id)
-        await interaction.response.send_message(f"Set '{permission_name.value}' to role '{role.name}'.", ephemeral=True)
-        await conn.close()
+        await set_role_setting(conn, permission_name.value, role.id, guild_id)
+        await interaction.followup.send(f"Set '{permission_name.value}' to role '{role.name}'.", ephemeral=True)
 
     @settings_group.command(name="view_roles", description="View current role settings")
     async def view_roles(self, interaction: discord.Interaction):
+        await interaction.response.defer(ephemeral=True, thinking=False)
         guild_id = interaction.guild_id
-        conn = await get_database_for_guild(guild_id)
+        settings = _SETTING_CACHE.get(guild_id)
+        if settings is None:
+            conn = await get_db(guild_id)
+            settings = await get_guild_settings(conn, guild_id)
+
         embed = discord.Embed(title="Current Role Settings", color=discord.Color.blue())
-        async with conn.cursor() as cursor:
-            await cursor.execute("SELECT setting_name, role_id FROM settings")
-            rows = await cursor.fetchall()
-            if rows:
-                for setting_name, role_id in rows:
-                    role = interaction.guild.get_role(role_id)
-                    role_name = role.name if role else "Role not found"
-                    embed.add_field(name=setting_name, value=role_name, inline=False)
-            else:
-                embed.description = "No settings found."
-        await interaction.response.send_message(embed=embed, ephemeral=True)
-        await conn.close()
+        if settings:
+            for setting_name, role_id in settings.items():
+                role = interaction.guild.get_role(role_id)
+                role_name = role.name if role else "Role not found"
+                embed.add_field(name=setting_name, value=role_name, inline=False)
+        else:
+            embed.description = "No settings found."
+        await interaction.followup.send(embed=embed, ephemeral=True)
 
 # ---------------- RaidAnnouncement Cog ---------------- #
 
+# Enhanced roles for F2B with emojis, using 🔥 for Dawnsong (fire weapon)
+_F2B_ROLES = (
+    ("🛡️ Tank", "Frontline Defender"),
+    ("🪓 Carrioncaller", "Axe DPS Specialist"),
+    ("💀 Curseskull", "Curse Caster"),
+    ("🐻 Bear", "Damage Absorber"),
+    ("🌳 Ent", "Nature Support"),
+    ("🔥 Dawnsong", "Fire Magic DPS"),
+    ("💚 Hallowfall", "Healing Support")
+)
+_F2B_EMOJIS = ("🛡️", "🪓", "💀", "🐻", "🌳", "🔥", "💚")
+
+# Static "Roles Needed" field and (label, emoji) pairs for the signup buttons, built once
+_F2B_ROLES_NEEDED_STATIC = "\n".join(f"{emoji} {role_name} - *{role_desc}*"
+                                     for emoji, (role_name, role_desc) in zip(_F2B_EMOJIS, _F2B_ROLES))
+_F2B_ROLE_BUTTONS = tuple((role_name, emoji) for emoji, (role_name, _) in zip(_F2B_EMOJIS, _F2B_ROLES))
+
 class RaidAnnouncement(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.active_events = {}
         self.message_id_to_event_id = {}
+        self._event_id_gen = itertools.count(1000)
+
+    async def cog_load(self):
+        self.prune_events.start()
+
+    async def cog_unload(self):
+        self.prune_events.cancel()
 
     @app_commands.command(name="f2b", description="Create a raid announcement for Roads F2B Comp")
     @app_commands.describe(time="Time when the event starts (HH:MM UTC)", role="Mention a role to ping")
@@ -210,12 +378,7 @@ class RaidAnnouncement(commands.Cog):
         await interaction.response.defer()
 
         try:
-            event_start_time = datetime.strptime(time, "%H:%M").replace(tzinfo=timezone.utc)
-            now_utc = datetime.now(timezone.utc)
-            event_start_time = event_start_time.replace(year=now_utc.year, month=now_utc.month, day=now_utc.day)
-
-            if event_start_time < now_utc:
-                event_start_time += timedelta(days=1)
+            event_start_time = _parse_hhmm_utc(time)
         except ValueError:
             await interaction.followup.send("Invalid time format. Please use HH:MM UTC (e.g., 14:00 UTC).", ephemeral=True)
             return
@@ -223,22 +386,9 @@ class RaidAnnouncement(commands.Cog):
         # Ensure role pings work by formatting the role mention properly
         ping_text = f"<@&{role.id}>" if role else ""
 
-        event_id = random.randint(1000, 9999)
-        while event_id in self.active_events:
-            event_id = random.randint(1000, 9999)
-
-        # Enhanced roles for F2B with emojis, using 🔥 for Dawnsong (fire weapon)
-        roles_list = [
-            ("🛡️ Tank", "Frontline Defender"),
-            ("🪓 Carrioncaller", "Axe DPS Specialist"),
-            ("💀 Curseskull", "Curse Caster"),
-            ("🐻 Bear", "Damage Absorber"),
-            ("🌳 Ent", "Nature Support"),
-            ("🔥 Dawnsong", "Fire Magic DPS"),
-            ("💚 Hallowfall", "Healing Support")
-        ]
+        event_id = next(self._event_id_gen)
 
-        user_roles = {role_name: [] for role_name, _ in roles_list}
+        user_roles = {role_name: [] for role_name, _ in _F2B_ROLES}
         active_users_roles = {}
 
         # Track cancellation state
@@ -246,9 +396,11 @@ class RaidAnnouncement(commands.Cog):
             'message_id': None,
             'channel_id': interaction.channel_id,
             'user_roles': user_roles,
+            'role_lines': {role_name: role_name for role_name in user_roles},
             'active_users_roles': active_users_roles,
             'start_time': event_start_time,
-            'cancelled': False  # New key to track if the event is canceled
+            'cancelled': False,  # New key to track if the event is canceled
+            'tasks': []
         }
 
         # Updated Embed for F2B with more visual appeal
@@ -260,11 +412,10 @@ class RaidAnnouncement(commands.Cog):
 
         embed.add_field(name="⚔️ **Gear & Mounts**", value="• Overcharge (OC)\n• Fast Mount (130%+)", inline=False)
 
-        roles_needed = "\n".join([f"{emoji} {role_name} - *{role_desc}*" for emoji, (role_name, role_desc) in zip(
-            ["🛡️", "🪓", "💀", "🐻", "🌳", "🔥", "💚"], roles_list)])
-        embed.add_field(name="🔍 **Roles Needed**", value=roles_needed, inline=False)
+        embed.add_field(name="🔍 **Roles Needed**", value=_F2B_ROLES_NEEDED_STATIC, inline=False)
 
         embed.add_field(name="📢 **Important Notes**", value="Stay calm, follow calls, and avoid tilting. Let's have fun!", inline=False)
+        self.active_events[event_id]['embed'] = embed
 
         view = View(timeout=None)
 
@@ -285,35 +436,27 @@ class RaidAnnouncement(commands.Cog):
                 active_users_roles = event_data['active_users_roles']
 
                 user_mention = button_interaction.user.mention
-                async with data_lock:
-                    if user_mention in user_roles[role_name]:
-                        user_roles[role_name].remove(user_mention)
-                        active_users_roles.pop(user_mention, None)
-                    else:
-                        if user_mention in active_users_roles:
-                            await button_interaction.response.send_message(
-                                "You have already signed up for a role. Unsign first.", ephemeral=True)
-                            return
-                        for other_role in user_roles:
-                            if user_mention in user_roles[other_role]:
-                                user_roles[other_role].remove(user_mention)
-                        user_roles[role_name].append(user_mention)
-                        active_users_roles[user_mention] = role_name
-
-                updated_embed = button_interaction.message.embeds[0]
-                roles_needed_updated = ""
-                for role in roles_list:
-                    users = user_roles[role[0]]
-                    if users:
-                        user_list = ', '.join(users)
-                        roles_needed_updated += f"{role[0]}: {user_list}\n"
-                    else:
-                        roles_needed_updated += f"{role[0]}\n"
+                previous_role = active_users_roles.get(user_mention)
+                if previous_role == role_name:
+                    user_roles[role_name].remove(user_mention)
+                    del active_users_roles[user_mention]
+                elif previous_role is not None:
+                    await button_interaction.response.send_message(
+                        "You have already signed up for a role. Unsign first.", ephemeral=True)
+                    return
+                else:
+                    user_roles[role_name].append(user_mention)
+                    active_users_roles[user_mention] = role_name
 
+                # Only the clicked role's line changed; the rest are reused
+                role_lines = event_data['role_lines']
+                role_lines[role_name] = format_role_line(role_name, user_roles[role_name])
+
+                updated_embed = event_data['embed']
                 updated_embed.set_field_at(
                     index=1,  # Index of the "🔍 Roles Needed" field
                     name="🔍 **Roles Needed**",
-                    value=roles_needed_updated.strip(),
+                    value="\n".join(role_lines.values()),
                     inline=False
                 )
                 await button_interaction.response.edit_message(embed=updated_embed)
@@ -321,7 +464,7 @@ class RaidAnnouncement(commands.Cog):
             return callback
 
         # Add visually enhanced buttons for each role
-        for emoji, (role, _) in zip(["🛡️", "🪓", "💀", "🐻", "🌳", "🔥", "💚"], roles_list):
+        for role, emoji in _F2B_ROLE_BUTTONS:
             button = Button(label=role, style=discord.ButtonStyle.primary, emoji=emoji)
             button.callback = role_signup_callback(role)
             view.add_item(button)
@@ -335,9 +478,8 @@ class RaidAnnouncement(commands.Cog):
                 return
 
             guild_id = button_interaction.guild_id
-            conn = await get_database_for_guild(guild_id)
-            role_id = await get_role_setting(conn, "Content Admin rights")
-            await conn.close()
+            conn = await get_db(guild_id)
+            role_id = await get_role_setting(conn, "Content Admin rights", guild_id)
 
             if role_id:
                 content_role = button_interaction.guild.get_role(role_id)
@@ -346,6 +488,8 @@ class RaidAnnouncement(commands.Cog):
                     await button_interaction.message.delete()
                     if event_id_lookup in self.active_events:
                         self.active_events[event_id_lookup]['cancelled'] = True
+                        for task in self.active_events[event_id_lookup]['tasks']:
+                            task.cancel()
                         del self.active_events[event_id_lookup]
                         del self.message_id_to_event_id[message_id]
                 else:
@@ -366,27 +510,23 @@ class RaidAnnouncement(commands.Cog):
         # Call the event timer tracking
         await self.track_event_time(event_id, event_start_time, interaction.channel)
 
-    # Updated event tracking to stop if the event is canceled
+    # Event tracking; cancelling the event cancels the scheduled reminder tasks
     async def track_event_time(self, event_id, event_start_time, channel):
-        five_minute_reminder_sent = False
-
-        while True:
-            now = datetime.now(timezone.utc)
-            remaining_time = event_start_time - now
-
-            if self.active_events.get(event_id, {}).get('cancelled', False):
-                # If the event is canceled, exit the loop
-                break
-
-            if remaining_time.total_seconds() <= 0:
-                await channel.send("🚨 Time's up! The event is starting now! 🚨")
-                break
-
-            if remaining_time.total_seconds() <= 300 and not five_minute_reminder_sent:
-                await channel.send("⚠️ Reminder: The event starts in 5 minutes! ⚠️")
-                five_minute_reminder_sent = True
-
-            await asyncio.sleep(60)
+        try:
+            event_data = self.active_events.get(event_id)
+            if event_data is None:
+                return
+            event_data['tasks'] = schedule_event_reminders(channel, event_start_time)
+            await asyncio.gather(*event_data['tasks'], return_exceptions=True)
+        finally:
+            event_data = self.active_events.pop(event_id, None)
+            if event_data is not None:
+                self.message_id_to_event_id.pop(event_data['message_id'], None)
+
+    # Hourly sweep for events whose tracking never finished
+    @tasks.loop(hours=1)
+    async def prune_events(self):
+        prune_expired_events(self.active_events, self.message_id_to_event_id)
 
 # ---------------- FFAnnouncement Cog ---------------- #
 
@@ -395,6 +535,18 @@ class FFAnnouncement(commands.Cog):
         self.bot = bot
         self.active_events = {}
         self.message_id_to_event_id = {}
+        self._event_id_gen = itertools.count(1000)
+
+    async def cog_load(self):
+        self.prune_events.start()
+
+    async def cog_unload(self):
+        self.prune_events.cancel()
+
+    # Hourly sweep for events whose tracking never finished
+    @tasks.loop(hours=1)
+    async def prune_events(self):
+        prune_expired_events(self.active_events, self.message_id_to_event_id)
 
     role_choices = {
         "Roads-Pve": [
@@ -423,11 +575,14 @@ class FFAnnouncement(commands.Cog):
         ]
     }
 
+    # (title, lowercased title) pairs, built once for the per-keystroke autocomplete
+    _TITLES = tuple((title, title.lower()) for title in role_choices)
+
     async def title_autocomplete(self, interaction: discord.Interaction, current: str):
-        titles = ["Roads-Pve", "Static Run", "Ava-Raid", "Ganking"]
+        current = current.lower()
         return [
             app_commands.Choice(name=title, value=title) 
-            for title in titles if current.lower() in title.lower()
+            for title, title_lower in self._TITLES if current in title_lower
         ]
 
     @app_commands.command(name="ff", description="Create a customizable raid announcement")
@@ -437,12 +592,7 @@ class FFAnnouncement(commands.Cog):
         await interaction.response.defer()
 
         try:
-            event_start_time = datetime.strptime(start_time, "%H:%M").replace(tzinfo=timezone.utc)
-            now_utc = datetime.now(timezone.utc)
-            event_start_time = event_start_time.replace(year=now_utc.year, month=now_utc.month, day=now_utc.day)
-            
-            if event_start_time < now_utc:
-                event_start_time += timedelta(days=1)
+            event_start_time = _parse_hhmm_utc(start_time)
         except ValueError:
             await interaction.followup.send("Invalid time format. Please use HH:MM UTC (e.g., 14:00 UTC).", ephemeral=True)
             return
@@ -453,9 +603,7 @@ class FFAnnouncement(commands.Cog):
         else:
             ping_text = roles_to_ping if roles_to_ping else ""
 
-        event_id = random.randint(1000, 9999)
-        while event_id in self.active_events:
-            event_id = random.randint(1000, 9999)
+        event_id = next(self._event_id_gen)
 
         if title in self.role_choices:
             roles_list = self.role_choices[title]
@@ -470,9 +618,11 @@ class FFAnnouncement(commands.Cog):
             'message_id': None,
             'channel_id': interaction.channel_id,
             'user_roles': user_roles,
+            'role_lines': {},  # Filled in once the roles are selected
             'active_users_roles': active_users_roles,
             'start_time': event_start_time,
-            'cancelled': False
+            'cancelled': False,
+            'tasks': []
         }
 
         embed = discord.Embed(
@@ -481,6 +631,7 @@ class FFAnnouncement(commands.Cog):
             color=discord.Color.blue()
         )
         embed.add_field(name="🔍 **Roles Needed**", value="No roles selected yet.", inline=False)
+        self.active_events[event_id]['embed'] = embed
 
         class RoleSelect(Select):
             def __init__(self, roles_list, message_id_to_event_id, event_id, active_events):
@@ -500,8 +651,14 @@ class FFAnnouncement(commands.Cog):
                     await select_interaction.response.send_message("Please select at least one role.", ephemeral=True)
                     return
 
+                event_data = self.active_events.get(self.event_id)
+                if event_data is None:
+                    await select_interaction.response.send_message("Error: Event not found.", ephemeral=True)
+                    return
+
                 user_roles_str = "\n".join(selected_roles)
                 embed.set_field_at(0, name="🔍 **Roles Needed**", value=user_roles_str)
+                event_data['role_lines'] = {r: r for r in selected_roles}
 
                 signup_buttons_view = View(timeout=None)
                 for role in selected_roles:
@@ -523,35 +680,27 @@ class FFAnnouncement(commands.Cog):
                         active_users_roles = event_data['active_users_roles']
 
                         user_mention = interaction.user.mention
-                        async with data_lock:
-                            if user_mention in user_roles[role]:
-                                user_roles[role].remove(user_mention)
-                                active_users_roles.pop(user_mention, None)
-                            else:
-                                if user_mention in active_users_roles:
-                                    await interaction.response.send_message(
-                                        "You have already signed up for a role. Unsign first.", ephemeral=True)
-                                    return
-                                for other_role in user_roles:
-                                    if user_mention in user_roles[other_role]:
-                                        user_roles[other_role].remove(user_mention)
-                                user_roles[role].append(user_mention)
-                                active_users_roles[user_mention] = role
-
-                        updated_embed = interaction.message.embeds[0]
-                        roles_needed_updated = ""
-                        for r in selected_roles:
-                            users = user_roles[r]
-                            if users:
-                                user_list = ', '.join(users)
-                                roles_needed_updated += f"{r}: {user_list}\n"
-                            else:
-                                roles_needed_updated += f"{r}\n"
+                        previous_role = active_users_roles.get(user_mention)
+                        if previous_role == role:
+                            user_roles[role].remove(user_mention)
+                            del active_users_roles[user_mention]
+                        elif previous_role is not None:
+                            await interaction.response.send_message(
+                                "You have already signed up for a role. Unsign first.", ephemeral=True)
+                            return
+                        else:
+                            user_roles[role].append(user_mention)
+                            active_users_roles[user_mention] = role
 
+                        # Only the clicked role's line changed; the rest are reused
+                        role_lines = event_data['role_lines']
+                        role_lines[role] = format_role_line(role, user_roles[role])
+
+                        updated_embed = event_data['embed']
                         updated_embed.set_field_at(
                             index=0,
                             name="🔍 **Roles Needed**",
-                            value=roles_needed_updated.strip(),
+                            value="\n".join(role_lines.values()),
                             inline=False
                         )
                         await interaction.response.edit_message(embed=updated_embed)
@@ -577,15 +726,20 @@ class FFAnnouncement(commands.Cog):
                 return
 
             guild_id = button_interaction.guild_id
-            conn = await get_database_for_guild(guild_id)
-            role_id = await get_role_setting(conn, "Content Admin rights")
-            await conn.close()
+            conn = await get_db(guild_id)
+            role_id = await get_role_setting(conn, "Content Admin rights", guild_id)
 
             if role_id:
                 content_role = button_interaction.guild.get_role(role_id)
                 if content_role in button_interaction.user.roles or button_interaction.user == interaction.user:
-                    event_data = self.active_events[event_id_lookup]
+                    # The event may have started or been cancelled while the role setting was read
+                    event_data = self.active_events.get(event_id_lookup)
+                    if event_data is None:
+                        await button_interaction.response.send_message("Error: Event not found.", ephemeral=True)
+                        return
                     event_data['cancelled'] = True
+                    for task in event_data['tasks']:
+                        task.cancel()
                     await button_interaction.response.send_message("🚫 Event cancelled by the event creator.", ephemeral=False)
                     await button_interaction.message.delete()
                     if event_id_lookup in self.active_events:
@@ -606,193 +760,261 @@ class FFAnnouncement(commands.Cog):
         self.active_events[event_id]['message_id'] = message_response.id
         self.message_id_to_event_id[message_response.id] = event_id
 
-        await track_event_time(interaction, event_start_time, event_id)
-
-# Update track_event_time to include event_id and stop when the event is canceled
-async def track_event_time(interaction, event_start_time, event_id):
-    five_minute_reminder_sent = False
-    channel = interaction.channel
-
-    while True:
-        now = datetime.now(timezone.utc)
-        remaining_time = event_start_time - now
+        await self.track_event_time(event_id, event_start_time, interaction.channel)
 
-        # Check if the event is canceled
-        if interaction.cog.active_events[event_id]['cancelled']:
-            break
+    # Event tracking; cancelling the event cancels the scheduled reminder tasks
+    async def track_event_time(self, event_id, event_start_time, channel):
+        try:
+            event_data = self.active_events.get(event_id)
+            if event_data is None:
+                return
+            event_data['tasks'] = schedule_event_reminders(channel, event_start_time)
+            await asyncio.gather(*event_data['tasks'], return_exceptions=True)
+        finally:
+            event_data = self.active_events.pop(event_id, None)
+            if event_data is not None:
+                self.message_id_to_event_id.pop(event_data['message_id'], None)
 
-        if remaining_time.total_seconds() <= 0:
-            await channel.send("🚨 Time's up! The event is starting now! 🚨")
-            break
+# ---------------- SplitTracker Cog with Enhanced Visuals and Verification for Non-Threads ---------------- #
 
-        if remaining_time.total_seconds() <= 300 and not five_minute_reminder_sent:
-            await channel.send("⚠️ Reminder: The event starts in 5 minutes! ⚠️")
-            five_minute_reminder_sent = True
+# Persistent confirm/cancel buttons for loot-splitter verification. A split is keyed by its
+# channel id, so the fixed custom_ids are enough to dispatch, and the handlers survive restarts.
+class SplitVerifyView(View):
+    def __init__(self, tracker):
+        super().__init__(timeout=None)
+        self.tracker = tracker
 
-        await asyncio.sleep(60)
+    @discord.ui.button(label="✅ Confirm Split", style=discord.ButtonStyle.success, custom_id="split_confirm")
+    async def confirm_split(self, interaction: discord.Interaction, button: Button):
+        await self.tracker.finalize_split(interaction, interaction.channel_id)
 
-# ---------------- SplitTracker Cog with Enhanced Visuals and Verification for Non-Threads ---------------- #
+    @discord.ui.button(label="❌ Cancel Split", style=discord.ButtonStyle.danger, custom_id="split_cancel")
+    async def cancel_split(self, interaction: discord.Interaction, button: Button):
+        await self.tracker.cancel_split(interaction, interaction.channel_id)
 
 class SplitTracker(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.tagged_members = {}
         self.tracked_message_ids = {}
+        self._tracked_messages = {}
+        self._pending_edits = {}
+        self._last_embed_hash = {}
+        self._verify_view = SplitVerifyView(self)
+
+    async def cog_load(self):
+        self.bot.add_view(self._verify_view)
+        self.prune_splits.start()
+
+    async def cog_unload(self):
+        self.prune_splits.cancel()
+
+    # Drop splits that were never confirmed or cancelled within a day
+    @tasks.loop(minutes=10)
+    async def prune_splits(self):
+        cutoff = time.monotonic() - 24 * 60 * 60
+        for post_id, split in list(self.tagged_members.items()):
+            if split['created_at'] < cutoff:
+                self._forget_split(post_id)
 
     @app_commands.command(name="split", description="Tag players and assign an optional value")
     @app_commands.describe(value="Optional value to split among tagged players", players="Mention players separated by spaces")
     async def split_members(self, interaction: discord.Interaction, players: str, value: str = None):
-        async with data_lock:
-            if not players:
-                await interaction.response.send_message("Please provide player mentions separated by spaces.", ephemeral=True)
-                return
-
-            guild_id = interaction.guild_id
-            conn = await get_database_for_guild(guild_id)
-
-            player_mentions = players.split()
-            members = []
-            mentions = []
-
-            for mention in player_mentions:
-                if mention.startswith('<@') and mention.endswith('>'):
-                    member_id = mention[2:-1].replace('!', '')
-                    try:
-                        member = await interaction.guild.fetch_member(int(member_id))
-                        if member:
-                            members.append(member)
-                            mentions.append(member.mention)
-                    except ValueError:
-                        await interaction.response.send_message(f"Invalid mention: {mention}", ephemeral=True)
-                        await conn.close()
-                        return
-                else:
-                    await interaction.response.send_message(f"Invalid mention format: {mention}", ephemeral=True)
-                    await conn.close()
-                    return
+        if not players:
+            await interaction.response.send_message("Please provide player mentions separated by spaces.", ephemeral=True)
+            return
 
-            post_id = interaction.channel.id
-            self.tagged_members[post_id] = {
-                'players': {member: {'submitted': False, 'image_count': 0, 'value_added': False} for member in members},
-                'worth': 0
-            }
-
-            # Adding loot split value
-            if value is not None and len(members) > 0:
-                worth = parse_value(value)
-                if worth is None:
-                    await interaction.response.send_message("Invalid value format. Use numbers with 'k' or 'm' as suffix.", ephemeral=True)
-                    await conn.close()
-                    return
-                worth = worth / len(members)
-                self.tagged_members[post_id]['worth'] = worth
-                formatted_worth = format_number(worth)
-
-                # **Enhanced Visuals for the Embed**
-                embed = discord.Embed(
-                    title="💰 **Loot Distribution in Progress** 💰",
-                    description=f"**Each player's share:** `{formatted_worth}` 💸\n\nTracking loot submissions below:",
-                    color=discord.Color.gold()
-                )
+        # Validate everything before touching Discord or the DB: only mentions and whitespace allowed
+        member_ids = list(map(int, _MENTION_RE.findall(players)))
+        if not member_ids or _MENTION_RE.sub('', players).strip():
+            await interaction.response.send_message("Invalid mention format. Mention players separated by spaces.", ephemeral=True)
+            return
 
-                player_info = []
-                for member in members:
-                    checkmark = "❌"
-                    current_total_value = await get_player_value(conn, member.id)
-                    formatted_value = f"`{formatted_worth}`"
-                    total_value = f"💰 `{format_number(current_total_value)}`"
-                    player_info.append(f"{member.display_name} {checkmark} | Share: {formatted_value} | Total Loot: {total_value}")
-
-                embed.add_field(
-                    name="👑 **Loot Split Participants** 👑",
-                    value="\n".join(player_info),
-                    inline=False
-                )
+        split_value = None
+        if value is not None:
+            split_value = parse_value(value)
+            if split_value is None:
+                await interaction.response.send_message("Invalid value format. Use numbers with 'k' or 'm' as suffix.", ephemeral=True)
+                return
 
-                embed.set_footer(text="📸 Submit loot screenshots to confirm participation")
+        # Acknowledge before the member fetches and DB reads so the interaction can't time out
+        await interaction.response.defer()
 
-                mentions_text = " ".join(mentions)
-                await interaction.response.send_message(f"📢 Loot split starting! {mentions_text} 💸")
-                message = await interaction.followup.send(embed=embed)
-                self.tracked_message_ids[post_id] = message.id
-                print(f"Embed created, message ID stored: {message.id}")
+        guild_id = interaction.guild_id
+        conn = await get_db(guild_id)
+
+        # Use cached members where possible and request the rest in one gateway call
+        members = [interaction.guild.get_member(member_id) for member_id in member_ids]
+        missing_ids = [member_id for member_id, member in zip(member_ids, members) if member is None]
+        if missing_ids:
+            try:
+                fetched = await interaction.guild.query_members(user_ids=missing_ids, limit=len(missing_ids), cache=True)
+            except (discord.ClientException, asyncio.TimeoutError):
+                results = await asyncio.gather(
+                    *(self._fetch_member(interaction.guild, member_id) for member_id in missing_ids),
+                    return_exceptions=True)
+                # Mentions of users who left the guild are skipped, like query_members does
+                fetched = []
+                for result in results:
+                    if isinstance(result, discord.NotFound):
+                        continue
+                    if isinstance(result, BaseException):
+                        raise result
+                    fetched.append(result)
+            fetched_by_id = {member.id: member for member in fetched}
+            members = [member or fetched_by_id.get(member_id) for member_id, member in zip(member_ids, members)]
+
+        members = [member for member in members if member]
+        if not members:
+            # The public deferral would turn the first followup into a public reply, so drop it first
+            await interaction.delete_original_response()
+            await interaction.followup.send("None of the mentioned players are members of this server.", ephemeral=True)
+            return
+        mentions = [member.mention for member in members]
+
+        post_id = interaction.channel.id
+        self._forget_split(post_id)
+        # Built locally and only registered once the embed is posted, so a failure part-way
+        # through never leaves a half-created split behind
+        split = {
+            'players': {member.id: {'submitted': False, 'image_count': 0, 'value_added': False,
+                                    'display_name': member.display_name} for member in members},
+            'worth': 0,
+            # Invariant for the split's lifetime, so formatted once here rather than per screenshot
+            'formatted_share': "`0`",
+            'created_at': time.monotonic()
+        }
 
-            else:
-                embed = discord.Embed(
-                    title="💰 **Loot Split** 💰",
-                    description="No value provided for this loot split.\nTracking loot submissions below:",
-                    color=discord.Color.gold()
-                )
+        # Adding loot split value
+        if split_value is not None and len(members) > 0:
+            worth = split_value / len(members)
+            split['worth'] = worth
+            formatted_worth = format_number(worth)
+            split['formatted_share'] = f"`{formatted_worth}`"
 
-                player_info = []
-                for member in members:
-                    checkmark = "❌"
-                    current_total_value = await get_player_value(conn, member.id)
-                    formatted_value = "`0`"
-                    total_value = f"💰 `{format_number(current_total_value)}`"
-                    player_info.append(f"{member.display_name} {checkmark} | Share: {formatted_value} | Total Loot: {total_value}")
-
-                embed.add_field(
-                    name="👑 **Loot Split Participants** 👑",
-                    value="\n".join(player_info),
-                    inline=False
-                )
+            # **Enhanced Visuals for the Embed**
+            embed = discord.Embed(
+                title="💰 **Loot Distribution in Progress** 💰",
+                description=f"**Each player's share:** `{formatted_worth}` 💸\n\nTracking loot submissions below:",
+                color=discord.Color.gold()
+            )
 
-                embed.set_footer(text="📸 Submit loot screenshots to confirm participation")
+        else:
+            embed = discord.Embed(
+                title="💰 **Loot Split** 💰",
+                description="No value provided for this loot split.\nTracking loot submissions below:",
+                color=discord.Color.gold()
+            )
+
+        # One bulk read of the current totals, then render each participant line once;
+        # a submission later rewrites only that player's line
+        totals = await get_player_values(conn, list(split['players']))
+        for player_id, info in split['players'].items():
+            info['formatted_total'] = format_number(totals[player_id])
+        split['lines'] = [format_split_line(info, split['formatted_share']) for info in split['players'].values()]
+        split['line_index'] = {player_id: index for index, player_id in enumerate(split['players'])}
+
+        embed.add_field(
+            name="👑 **Loot Split Participants** 👑",
+            value="\n".join(split['lines']),
+            inline=False
+        )
 
-                mentions_text = " ".join(mentions)
-                await interaction.response.send_message(f"📢 Loot split starting! {mentions_text} 💸")
-                message = await interaction.followup.send(embed=embed)
-                self.tracked_message_ids[post_id] = message.id
-                print(f"Embed created, message ID stored: {message.id}")
+        embed.set_footer(text="📸 Submit loot screenshots to confirm participation")
 
-            await conn.close()
+        mentions_text = " ".join(mentions)
+        async with self.bot.rest_limiter:
+            await interaction.followup.send(f"📢 Loot split starting! {mentions_text} 💸")
+        async with self.bot.rest_limiter:
+            message = await interaction.followup.send(embed=embed)
+        # Keep a bot-token handle and the Embed so later refreshes never need fetch_message
+        split['embed'] = embed
+        self.tagged_members[post_id] = split
+        self.tracked_message_ids[post_id] = message.id
+        self._tracked_messages[post_id] = interaction.channel.get_partial_message(message.id)
+        logger.debug("Embed created, message ID stored: %s", message.id)
 
     # Event listener to track image submissions and add checkmark reaction
     @commands.Cog.listener()
     async def on_message(self, message: discord.Message):
-        if message.attachments or any([url for url in message.content.split() if url.startswith('http')]):
-            channel_id = message.channel.id
-            if channel_id in self.tagged_members:
-                player_info = self.tagged_members[channel_id]['players']
-                if message.author in player_info:
-                    # Update the player submission status
-                    player_info[message.author]['submitted'] = True
-                    player_info[message.author]['image_count'] += 1
-
-                    # Add the checkmark reaction to the message
-                    await message.add_reaction("✅")
-
-                    # Fetch the player values from the database
-                    guild_id = message.guild.id
-                    conn = await get_database_for_guild(guild_id)
-
-                    message_id = self.tracked_message_ids.get(channel_id)
-                    if message_id:
-                        try:
-                            channel = message.channel
-                            tracked_message = await channel.fetch_message(message_id)
-                            embed = tracked_message.embeds[0]
-
-                            updated_player_info = []
-                            for player, info in player_info.items():
-                                checkmark = "✅" if info['submitted'] else "❌"
-                                worth = self.tagged_members[channel_id]['worth']
-                                current_total_value = await get_player_value(conn, player.id)
-                                formatted_value = f"`{format_number(worth)}`"
-                                total_value = f"💰 `{format_number(current_total_value)}`"
-                                updated_player_info.append(f"{player.display_name} {checkmark} | Share: {formatted_value} | Total Loot: {total_value}")
-
-                            embed.set_field_at(0, name="👑 **Loot Split Participants** 👑", value="\n".join(updated_player_info), inline=False)
-                            await tracked_message.edit(embed=embed)
-
-                            # Check if all players have submitted and trigger loot-splitter verification
-                            if all(info['submitted'] for info in player_info.values()):
-                                await self.trigger_loot_splitter_verification(message.channel, channel_id)
-
-                        except Exception as e:
-                            print(f"Failed to update embed: {e}")
-                    await conn.close()
+        # Cheapest checks first: most messages are not in a tracked split channel
+        channel_id = message.channel.id
+        if channel_id not in self.tagged_members:
+            return
+        if not message.attachments:
+            content = message.content
+            if 'http' not in content or not any(token.startswith(('http://', 'https://')) for token in content.split()):
+                return
+
+        split = self.tagged_members[channel_id]
+        author_info = split['players'].get(message.author.id)
+        if author_info is not None:
+            # Update the player submission status
+            author_info['submitted'] = True
+            author_info['image_count'] += 1
+
+            # Only the first screenshot changes anything visible
+            if author_info['image_count'] > 1:
+                return
+            split['lines'][split['line_index'][message.author.id]] = format_split_line(author_info, split['formatted_share'])
+
+            # Add the checkmark reaction to the message
+            async with self.bot.rest_limiter:
+                await message.add_reaction("✅")
+
+            # Coalesce bursts of uploads into a single embed edit
+            self._schedule_embed_update(message.channel)
+
+    def _schedule_embed_update(self, channel):
+        pending = self._pending_edits.get(channel.id)
+        if pending is not None:
+            pending.cancel()
+        self._pending_edits[channel.id] = asyncio.create_task(self._flush_edit(channel))
+
+    # Refresh the tracked embed once uploads have settled, skipping the edit if nothing changed
+    async def _flush_edit(self, channel):
+        await asyncio.sleep(0.75)
+        channel_id = channel.id
+        self._pending_edits.pop(channel_id, None)
+
+        split = self.tagged_members.get(channel_id)
+        message_id = self.tracked_message_ids.get(channel_id)
+        if split is None or message_id is None:
+            return
+        player_info = split['players']
+
+        try:
+            participants = "\n".join(split['lines'])
+            embed_hash = hash(participants)
+            if embed_hash != self._last_embed_hash.get(channel_id):
+                tracked_message = self._tracked_messages.get(channel_id) or channel.get_partial_message(message_id)
+                embed = split['embed']
+                embed.set_field_at(0, name="👑 **Loot Split Participants** 👑", value=participants, inline=False)
+                async with self.bot.rest_limiter:
+                    await tracked_message.edit(embed=embed)
+                self._last_embed_hash[channel_id] = embed_hash
+
+            # Check if all players have submitted and trigger loot-splitter verification
+            if all(info['submitted'] for info in player_info.values()):
+                await self.trigger_loot_splitter_verification(channel, channel_id)
+
+        except Exception:
+            logger.exception("Failed to update embed")
+
+    # Fetch one member over REST, paced by the shared limiter
+    async def _fetch_member(self, guild, member_id):
+        async with self.bot.rest_limiter:
+            return await guild.fetch_member(member_id)
+
+    # Drop all state kept for a split
+    def _forget_split(self, post_id):
+        self.tagged_members.pop(post_id, None)
+        self.tracked_message_ids.pop(post_id, None)
+        self._tracked_messages.pop(post_id, None)
+        self._last_embed_hash.pop(post_id, None)
+        pending = self._pending_edits.pop(post_id, None)
+        if pending is not None:
+            pending.cancel()
 
     # Function to trigger loot-splitter verification
     async def trigger_loot_splitter_verification(self, channel, post_id):
@@ -801,39 +1023,32 @@ class SplitTracker(commands.Cog):
             description="All players have submitted their loot. A loot-splitter must verify and confirm the split.",
             color=discord.Color.gold()
         )
-        message = await channel.send(embed=embed)
-
-        # Add the confirm and cancel buttons for the loot-splitter
-        view = View(timeout=None)
-
-        async def confirm_split(interaction: discord.Interaction):
-            await self.finalize_split(interaction, post_id)
-
-        async def cancel_split(interaction: discord.Interaction):
-            await self.cancel_split(interaction, post_id)
-
-        confirm_button = Button(label="✅ Confirm Split", style=discord.ButtonStyle.success)
-        confirm_button.callback = confirm_split
-        view.add_item(confirm_button)
-
-        cancel_button = Button(label="❌ Cancel Split", style=discord.ButtonStyle.danger)
-        cancel_button.callback = cancel_split
-        view.add_item(cancel_button)
-
-        await message.edit(embed=embed, view=view)
+        async with self.bot.rest_limiter:
+            await channel.send(embed=embed, view=self._verify_view)
 
     # Function to finalize the split, add values to each player, and close the thread if applicable
     async def finalize_split(self, interaction: discord.Interaction, post_id):
-        guild_id = interaction.guild_id
-        conn = await get_database_for_guild(guild_id)
-
-        for player, info in self.tagged_members[post_id]['players'].items():
-            if info['submitted'] and not info['value_added']:
-                worth = self.tagged_members[post_id]['worth']
-                await add_to_player_value(conn, player.id, worth)
-                info['value_added'] = True
+        if post_id not in self.tagged_members:
+            await interaction.response.send_message("This loot split is no longer active.", ephemeral=True)
+            return
 
-        await conn.close()
+        guild_id = interaction.guild_id
+        worth = self.tagged_members[post_id]['worth']
+        pending = [(player_id, info) for player_id, info in self.tagged_members[post_id]['players'].items()
+                   if info['submitted'] and not info['value_added']]
+
+        # Claim the payouts before awaiting, so a second Confirm click can't pay the same players
+        for _, info in pending:
+            info['value_added'] = True
+
+        if pending:
+            try:
+                conn = await get_db(guild_id)
+                await add_to_player_values(conn, [(player_id, worth) for player_id, _ in pending])
+            except Exception:
+                for _, info in pending:
+                    info['value_added'] = False
+                raise
 
         # If in a thread, unarchive and close it, else confirm normally
         if isinstance(interaction.channel, discord.Thread):
@@ -849,10 +1064,14 @@ class SplitTracker(commands.Cog):
             await interaction.response.send_message("✅ The loot split has been successfully confirmed, values have been updated.", ephemeral=True)
 
         # Remove the split data from the tracked members
-        del self.tagged_members[post_id]
+        self._forget_split(post_id)
 
     async def cancel_split(self, interaction: discord.Interaction, post_id):
-        del self.tagged_members[post_id]
+        if post_id not in self.tagged_members:
+            await interaction.response.send_message("This loot split is no longer active.", ephemeral=True)
+            return
+
+        self._forget_split(post_id)
         await interaction.response.send_message("The loot split has been canceled.", ephemeral=True)
 
 
@@ -862,15 +1081,16 @@ class AdminCommands(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
 
-    async def cog_check(self, interaction: discord.Interaction):
+    # Ensure only members with the Split-admin role can use the admin commands
+    async def interaction_check(self, interaction: discord.Interaction):
         guild_id = interaction.guild_id
-        conn = await get_database_for_guild(guild_id)
-        role_id = await get_role_setting(conn, "Split-admin rights")
-        await conn.close()
+        conn = await get_db(guild_id)
+        role_id = await get_role_setting(conn, "Split-admin rights", guild_id)
 
         if role_id:
-            admin_role = discord.utils.get(interaction.guild.roles, id=role_id)
-            if admin_role in interaction.user.roles:
+            # Compare ids directly; no need to resolve the Role object from the guild
+            user_role_ids = {role.id for role in interaction.user.roles}
+            if role_id in user_role_ids:
                 return True
             else:
                 await interaction.response.send_message("You do not have permission to use this command.", ephemeral=True)
@@ -882,51 +1102,44 @@ class AdminCommands(commands.Cog):
     @app_commands.command(name="addvalue", description="Add value to a player's total value")
     @app_commands.describe(player="Player to add value to", value="Value to add")
     async def add_value(self, interaction: discord.Interaction, player: discord.Member, value: str):
-        guild_id = interaction.guild_id
-        conn = await get_database_for_guild(guild_id)
         amount = parse_value(value)
-
         if amount is None:
             await interaction.response.send_message("Invalid value format. Use numbers with 'k' or 'm' as suffix.", ephemeral=True)
-            await conn.close()
             return
 
+        guild_id = interaction.guild_id
+        conn = await get_db(guild_id)
         await add_to_player_value(conn, player.id, amount)
         await interaction.response.send_message(f"Added {format_number(amount)} to {player.display_name}'s total value.")
-        await conn.close()
 
     @app_commands.command(name="removevalue", description="Remove value from a player's total value")
     @app_commands.describe(player="Player to remove value from", value="Value to remove")
     async def remove_value(self, interaction: discord.Interaction, player: discord.Member, value: str):
-        guild_id = interaction.guild_id
-        conn = await get_database_for_guild(guild_id)
-
         amount = parse_value(value)
         if amount is None:
             await interaction.response.send_message("Invalid value format. Use numbers with 'k' or 'm' as suffix.", ephemeral=True)
-            await conn.close()
             return
 
+        guild_id = interaction.guild_id
+        conn = await get_db(guild_id)
         await remove_from_player_value(conn, player.id, amount)
         await interaction.response.send_message(f"Removed {format_number(amount)} from {player.display_name}'s total value.")
-        await conn.close()
 
     @app_commands.command(name="resetvalue", description="Reset a player's total value")
     @app_commands.describe(player="Player to reset")
     async def reset_value(self, interaction: discord.Interaction, player: discord.Member):
         guild_id = interaction.guild_id
-        conn = await get_database_for_guild(guild_id)
+        conn = await get_db(guild_id)
 
         await reset_player_value(conn, player.id)
         await interaction.response.send_message(f"Reset {player.display_name}'s total value to 0.")
-        await conn.close()
 
 # ---------------- Main Function ---------------- #
 
 async def main():
     bot_token = os.getenv('DISCORD_BOT_TOKEN')
     if bot_token is None:
-        print("Error: DISCORD_BOT_TOKEN environment variable not set.")
+        logger.error("DISCORD_BOT_TOKEN environment variable not set.")
         return
 
     await bot.add_cog(BotSettings(bot))
@@ -937,8 +1150,14 @@ async def main():
 
     try:
         await bot.start(bot_token)
-    except Exception as e:
-        print(f"An error occurred while running the bot: {e}")
+    except Exception:
+        logger.exception("An error occurred while running the bot")
+    finally:
+        await close_databases()
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    log_listener.start()
+    try:
+        asyncio.run(main())
+    finally:
+        log_listener.stop()